@@ -0,0 +1,109 @@
+"""
+Asyncio-native scrapli backend for nm_operations.
+
+Selected with NM_BACKEND=scrapli. Device dictionaries use the same Netmiko
+keys as the rest of nm_operations and are translated to scrapli arguments
+here. scrapli is an optional dependency and is only imported when this
+backend is used.
+"""
+import logging
+from scrapli import AsyncScrapli
+
+# Netmiko device_type -> scrapli platform
+_PLATFORMS = {
+    "cisco_ios": "cisco_iosxe",
+    "cisco_xe": "cisco_iosxe",
+    "cisco_nxos": "cisco_nxos",
+    "cisco_xr": "cisco_iosxr",
+    "juniper_junos": "juniper_junos",
+    "arista_eos": "arista_eos",
+}
+
+
+def _driver_args(device_info):
+    device_type = device_info["device_type"]
+    return {
+        "platform": _PLATFORMS.get(device_type, device_type),
+        "host": device_info["host"],
+        "port": device_info.get("port", 22),
+        "auth_username": device_info.get("username"),
+        "auth_password": device_info.get("password"),
+        "auth_secondary": device_info.get("secret", ""),
+        "auth_strict_key": False,
+        "transport": "asyncssh",
+    }
+
+
+async def connect(device_info):
+    """
+    Open an asyncssh-backed scrapli connection.
+
+    Args:
+        device_info (dict): A dictionary containing device connection details.
+
+    Returns:
+        scrapli.AsyncScrapli: An open connection, or None if it failed.
+    """
+    try:
+        connection = AsyncScrapli(**_driver_args(device_info))
+        await connection.open()
+        logging.info("Successfully connected to %s", device_info['host'])
+        return connection
+    except Exception as e:
+        logging.error("Failed to connect to %s: %s", device_info['host'], e)
+        return None
+
+
+async def disconnect(connection):
+    """Close a scrapli connection."""
+    if connection:
+        await connection.close()
+        logging.info("Disconnected successfully.")
+
+
+async def send_commands(connection, commands):
+    """
+    Run commands back to back on one scrapli connection.
+
+    scrapli writes each command as soon as the previous prompt is seen, so no
+    extra prompt detection happens between commands.
+
+    Args:
+        connection (scrapli.AsyncScrapli): An open connection.
+        commands (list): A list of commands to execute.
+
+    Returns:
+        dict: A dictionary with command as key and output as value; output
+        is None if the command could not be executed.
+    """
+    if not connection:
+        logging.info("No active connection to execute commands.")
+        return None
+
+    try:
+        responses = await connection.send_commands(commands)
+    except Exception as e:
+        logging.error("Failed to execute commands %s: %s", commands, e)
+        return dict.fromkeys(commands)
+
+    outputs = [None] * len(commands)
+    rejected = 0
+    for i, response in enumerate(responses):
+        # Like the Netmiko path, a rejected command keeps the device's message.
+        if response.failed:
+            logging.error("Device rejected command '%s': %s", response.channel_input, response.result.strip())
+            rejected += 1
+        outputs[i] = response.result
+    logging.info("Executed %d command(s), %d rejected.", len(commands), rejected)
+    return dict(zip(commands, outputs))
+
+
+async def run_on_device(device_info, commands):
+    """Connect, run commands and disconnect."""
+    connection = await connect(device_info)
+    if connection is None:
+        return None
+    try:
+        return await send_commands(connection, commands)
+    finally:
+        await disconnect(connection)
@@ -1,60 +1,485 @@
+import asyncio
+import atexit
+import hashlib
+import itertools
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
 from netmiko import ConnectHandler
-from netmiko.exceptions import ConnectionException, NetmikoTimeoutException, NetmikoAuthenticationException, SSHException
+from netmiko.channel import SSHChannel
+from netmiko.ssh_dispatcher import CLASS_MAPPER
+from netmiko.exceptions import ConnectionException, NetmikoTimeoutException, NetmikoAuthenticationException, ReadException, ReadTimeout, SSHException
 
 
-def connect_to_device(device_info):
+# Idle connections kept per (host, port, username, credentials, device_type) key.
+CONNECTION_POOL_MAX_SIZE = int(os.environ.get("CONNECTION_POOL_MAX_SIZE", "4"))
+# Seconds a pooled connection may sit unused before it is closed.
+CONNECTION_POOL_IDLE_TIMEOUT = float(os.environ.get("CONNECTION_POOL_IDLE_TIMEOUT", "300"))
+# Seconds after which a connection is closed instead of being returned to the pool.
+CONNECTION_POOL_MAX_AGE = float(os.environ.get("CONNECTION_POOL_MAX_AGE", "3600"))
+# Default interval (seconds) for SSH-level keepalives when device_info sets no
+# "keepalive" of its own; 0 disables the default.
+SSH_KEEPALIVE_INTERVAL = int(os.environ.get("SSH_KEEPALIVE_INTERVAL", "30"))
+# Open new sessions as extra channels on an already-authenticated SSH transport.
+SSH_TRANSPORT_REUSE = os.environ.get("SSH_TRANSPORT_REUSE", "0") == "1"
+# Backend used by the async helpers: "netmiko" (threads) or "scrapli" (asyncssh).
+NM_BACKEND = os.environ.get("NM_BACKEND", "netmiko").lower()
+if NM_BACKEND not in ("netmiko", "scrapli"):
+    raise ValueError(f"Unsupported NM_BACKEND: {NM_BACKEND!r} (expected 'netmiko' or 'scrapli')")
+# Default upper bound on devices contacted concurrently by the async helpers.
+DEFAULT_MAX_CONNECTIONS = 20
+
+# Log message per connection failure type, checked in order (most specific first).
+_CONNECT_ERRORS = {
+    NetmikoAuthenticationException: "Authentication failed for %s: %s",
+    NetmikoTimeoutException: "Connection timed out for %s: %s",
+    ConnectionException: "Connection error for %s: %s",
+    SSHException: "SSH error while connecting to %s: %s",
+}
+
+# Markers IOS-style CLIs print when a command is rejected.
+_CLI_ERROR_RE = re.compile(r"^\s*% (?:Invalid|Incomplete|Ambiguous) ", re.MULTILINE)
+# Commands that never ask for input, so they can be queued on the channel
+# without a later command line being taken as the answer to a prompt.
+_PIPELINE_SAFE_RE = re.compile(r"^\s*(?:show|sh|display|dis)\s", re.IGNORECASE)
+
+
+@dataclass
+class PooledConn:
+    """A Netmiko connection tracked by the connection pool."""
+    connection: object
+    key: tuple
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    checked_out: bool = True
+    dirty: bool = False  # Unread output may be left on the channel; never pool again
+    pending_output: bool = False  # A pipelined batch has not been read to the end yet
+    in_config_mode: bool = False  # Left in config mode by configure_device_batch
+    prompt: Optional[str] = None  # Exec-mode prompt, cached after the first lookup
+    expect_string: Optional[str] = None  # Prompt pattern passed to send_command
+
+
+_POOL: dict = {}  # key -> list of idle PooledConn
+_POOL_LOCK = threading.Lock()
+
+_TRANSPORT_CACHE: dict = {}  # (host, port, username, credential digest) -> paramiko.Transport
+_TRANSPORT_USERS: dict = {}  # paramiko.Transport -> number of open sessions on it
+_TRANSPORT_LOCK = threading.Lock()
+_SHARED_CLASSES: dict = {}   # device_type -> Netmiko class with _SharedTransportMixin
+
+
+class _SharedTransportMixin:
+    """
+    Netmiko connection that opens its shell on a cached Paramiko transport.
+
+    The first connection to a host performs the normal key exchange and
+    authentication and leaves its transport in _TRANSPORT_CACHE. Later
+    connections open a new channel on that transport instead of negotiating a
+    new one. Disconnecting closes the channel, and the transport is closed
+    when its last session ends. Devices that refuse a second channel fall back
+    to a full handshake.
+    """
+
+    def _transport_key(self):
+        # A transport is only shared with sessions that authenticate the same way.
+        return (self.host, self.port, self.username,
+                _credential_digest(lambda name: getattr(self, name, None)))
+
+    def establish_connection(self, width=511, height=1000):
+        if self.protocol != "ssh":
+            return super().establish_connection(width=width, height=height)
+
+        key = self._transport_key()
+        with _TRANSPORT_LOCK:
+            transport = _TRANSPORT_CACHE.get(key)
+        if transport is not None and transport.is_active():
+            channel = None
+            try:
+                channel = transport.open_session()
+                channel.get_pty(term="vt100", width=width, height=height)
+                channel.invoke_shell()
+            except Exception as e:
+                logging.debug("Could not reuse SSH transport to %s: %s", self.host, e)
+                if channel is not None:
+                    channel.close()
+            else:
+                with _TRANSPORT_LOCK:
+                    _TRANSPORT_USERS[transport] = _TRANSPORT_USERS.get(transport, 0) + 1
+                self.remote_conn_pre = None
+                self.remote_conn = channel
+                self.remote_conn.settimeout(self.blocking_timeout)
+                if self.keepalive:
+                    transport.set_keepalive(self.keepalive)
+                self.channel = SSHChannel(conn=self.remote_conn, encoding=self.encoding)
+                self.special_login_handler()
+                return None
+
+        super().establish_connection(width=width, height=height)
+        transport = self.remote_conn.get_transport()
+        with _TRANSPORT_LOCK:
+            _TRANSPORT_CACHE[key] = transport
+            _TRANSPORT_USERS[transport] = _TRANSPORT_USERS.get(transport, 0) + 1
+        return None
+
+    def paramiko_cleanup(self):
+        # The transport is shared; close it, and drop it from the cache, once
+        # its last session ends. Idle sessions kept by the connection pool
+        # still count as users, so CONNECTION_POOL_IDLE_TIMEOUT bounds its life.
+        if getattr(self, "remote_conn", None) is None:
+            # Login failed before a shell was opened; close the SSHClient the
+            # way Netmiko does.
+            return super().paramiko_cleanup()
+        transport = self.remote_conn.get_transport()
+        self.remote_conn.close()
+        with _TRANSPORT_LOCK:
+            users = _TRANSPORT_USERS.get(transport, 1) - 1
+            if users > 0:
+                _TRANSPORT_USERS[transport] = users
+                return
+            _TRANSPORT_USERS.pop(transport, None)
+            key = self._transport_key()
+            if _TRANSPORT_CACHE.get(key) is transport:
+                del _TRANSPORT_CACHE[key]
+        transport.close()
+
+
+def _shared_transport_class(device_type):
+    cls = _SHARED_CLASSES.get(device_type)
+    if cls is None:
+        base = CLASS_MAPPER[device_type]
+        cls = type(f"SharedTransport{base.__name__}", (_SharedTransportMixin, base), {})
+        _SHARED_CLASSES[device_type] = cls
+    return cls
+
+
+def close_transport_cache():
+    """Close every cached SSH transport, ending all sessions opened on them."""
+    with _TRANSPORT_LOCK:
+        transports = set(_TRANSPORT_CACHE.values()) | set(_TRANSPORT_USERS)
+        _TRANSPORT_CACHE.clear()
+        _TRANSPORT_USERS.clear()
+    for transport in transports:
+        transport.close()
+
+
+def _pool_entry(connection):
+    """Return the PooledConn attached to a connection by connect_to_device, if any."""
+    return getattr(connection, "_nm_pool_entry", None)
+
+
+# Connection arguments that decide how a session authenticates.
+_AUTH_FIELDS = ("password", "secret", "key_file", "use_keys", "passphrase", "pkey",
+                "allow_agent", "ssh_config_file", "sock",
+                "ssh_strict", "system_host_keys", "alt_host_keys", "alt_key_file")
+
+
+def _credential_digest(get):
+    """
+    Hash the authentication arguments so sessions are only reused for callers
+    that would have authenticated the same way. Objects such as pkey and sock
+    are compared by identity.
+    """
+    values = []
+    for name in _AUTH_FIELDS:
+        value = get(name)
+        if not isinstance(value, (str, bytes, int, float, bool, type(None))):
+            value = f"<{type(value).__name__} {id(value)}>"
+        values.append(value)
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
+def _pool_key(device_info):
+    return (
+        device_info["host"],
+        device_info.get("port", 22),
+        device_info.get("username"),
+        _credential_digest(device_info.get),
+        device_info.get("device_type"),
+    )
+
+
+def _is_expired(pooled, now):
+    return (now - pooled.last_used > CONNECTION_POOL_IDLE_TIMEOUT
+            or now - pooled.created_at > CONNECTION_POOL_MAX_AGE)
+
+
+def _is_fresh(pooled):
+    """
+    Check a pooled connection without talking to the device.
+
+    SSH transports carry keepalives (see SSH_KEEPALIVE_INTERVAL), so a dead
+    peer shows up as an inactive transport. Returns None for connections
+    without an SSH transport, where only an in-band probe can tell.
+    """
+    remote_conn = getattr(pooled.connection, "remote_conn", None)
+    if remote_conn is None:
+        return False
+    get_transport = getattr(remote_conn, "get_transport", None)
+    if get_transport is None:
+        return None
+    transport = get_transport()
+    return not remote_conn.closed and transport is not None and transport.is_active()
+
+
+def _enable_keepalive(connection):
+    """Have Paramiko keep the SSH transport warm instead of probing in-band."""
+    get_transport = getattr(getattr(connection, "remote_conn", None), "get_transport", None)
+    if SSH_KEEPALIVE_INTERVAL <= 0 or get_transport is None:
+        return
+    transport = get_transport()
+    if transport is not None:
+        transport.set_keepalive(SSH_KEEPALIVE_INTERVAL)
+
+
+def _close_quietly(connection):
+    try:
+        connection.disconnect()
+    except Exception as e:
+        logging.debug("Error while closing pooled connection: %s", e)
+
+
+def _sweep_pool(now):
+    """Remove expired idle connections from the pool. Caller must hold _POOL_LOCK."""
+    expired = []
+    for key in list(_POOL):
+        alive = []
+        for pooled in _POOL[key]:
+            (expired if _is_expired(pooled, now) else alive).append(pooled)
+        if alive:
+            _POOL[key] = alive
+        else:
+            del _POOL[key]
+    return expired
+
+
+def _checkout(key):
+    """Return a live pooled connection for key, or None on a pool miss."""
+    with _POOL_LOCK:
+        expired = _sweep_pool(time.monotonic())
+        candidates = _POOL.pop(key, [])
+    for pooled in expired:
+        _close_quietly(pooled.connection)
+
+    while candidates:
+        pooled = candidates.pop()
+        alive = _is_fresh(pooled)
+        if alive is None:
+            try:
+                alive = pooled.connection.is_alive()
+            except Exception:
+                alive = False
+        if not alive:
+            _close_quietly(pooled.connection)
+            continue
+        pooled.last_used = time.monotonic()
+        pooled.checked_out = True
+        with _POOL_LOCK:
+            if candidates:
+                _POOL.setdefault(key, []).extend(candidates)
+        return pooled
+    return None
+
+
+def _cached_prompt(connection):
+    """Return the exec-mode prompt, reusing the value cached on a pooled connection."""
+    pooled = _pool_entry(connection)
+    if pooled is not None and pooled.prompt:
+        return pooled.prompt
+    prompt = connection.find_prompt()
+    if pooled is not None:
+        pooled.prompt = prompt
+    return prompt
+
+
+def _send_command_kwargs(connection, send_kwargs):
+    """
+    Build send_command arguments that skip prompt detection and output parsing.
+
+    For pooled connections the expect_string is built from the prompt cached on
+    the pool entry: base_prompt, an optional mode suffix such as '(config)',
+    and the prompt's own last character ('#', '>', '$', ...). send_command then
+    does not call find_prompt on every invocation. Other connections keep
+    Netmiko's own prompt detection. Explicit send_kwargs take precedence.
+    """
+    kwargs = {
+        "read_timeout": 30,
+        "strip_prompt": True,
+        "strip_command": True,
+        "use_textfsm": False,
+        "use_genie": False,
+    }
+    pooled = _pool_entry(connection)
+    if pooled is not None and "expect_string" not in send_kwargs:
+        if pooled.expect_string is None:
+            try:
+                pooled.expect_string = _expect_pattern(connection, _cached_prompt(connection))
+            except Exception as e:
+                logging.debug("Could not determine the prompt, using Netmiko's detection: %s", e)
+        if pooled.expect_string:
+            kwargs["expect_string"] = pooled.expect_string
+    kwargs.update(send_kwargs)
+    return kwargs
+
+
+def _expect_pattern(connection, prompt):
+    prompt = prompt.strip()
+    if not prompt:
+        return None
+    base_prompt = getattr(connection, "base_prompt", None) or prompt[:-1]
+    if not prompt.startswith(base_prompt):
+        base_prompt = prompt[:-1]
+    return re.escape(base_prompt) + r"(?:\(\S+\))?" + re.escape(prompt[-1])
+
+
+def _forget_prompt(connection):
+    pooled = _pool_entry(connection)
+    if pooled is not None:
+        pooled.prompt = None
+        pooled.expect_string = None
+
+
+def _set_config_mode(connection, in_config_mode):
+    pooled = _pool_entry(connection)
+    if pooled is not None:
+        pooled.in_config_mode = in_config_mode
+    _forget_prompt(connection)
+
+
+def _set_pending_output(connection, pending):
+    pooled = _pool_entry(connection)
+    if pooled is not None:
+        pooled.pending_output = pending
+
+
+def _mark_dirty(connection):
+    """Keep a session whose channel state is unknown from going back to the pool."""
+    pooled = _pool_entry(connection)
+    if pooled is not None:
+        pooled.dirty = True
+    _forget_prompt(connection)
+
+
+def close_connection_pool():
+    """Disconnect every idle connection held by the pool."""
+    with _POOL_LOCK:
+        idle = [pooled for entries in _POOL.values() for pooled in entries]
+        _POOL.clear()
+    for pooled in idle:
+        _close_quietly(pooled.connection)
+    logging.info("Closed %s pooled connection(s).", len(idle))
+
+
+# atexit runs handlers in reverse order: pooled sessions log out first.
+atexit.register(close_transport_cache)
+atexit.register(close_connection_pool)
+
+
+def connect_to_device(device_info, reuse_transport=None):
     """
     Connect to a network device using Netmiko.
 
+    A live connection from the pool is returned when one exists for the same
+    host, port, username, credentials and device type; otherwise a new
+    session is opened.
+
     Args:
         device_info (dict): A dictionary containing device connection details.
+        reuse_transport (bool): Open the new session as a channel on a cached
+            SSH transport to the same host, skipping key exchange. Defaults to
+            SSH_TRANSPORT_REUSE.
 
     Returns:
         netmiko.ConnectHandler: An active connection handler.
     """
+    key = _pool_key(device_info)
+    pooled = _checkout(key)
+    if pooled is not None:
+        logging.info("Reusing pooled connection to %s", device_info['host'])
+        return pooled.connection
+
+    if reuse_transport is None:
+        reuse_transport = SSH_TRANSPORT_REUSE
+
     try:
-        connection = ConnectHandler(**device_info)
-        logging.info(f"Successfully connected to {device_info['host']}")
+        if reuse_transport and device_info.get("device_type") in CLASS_MAPPER:
+            connection = _shared_transport_class(device_info["device_type"])(**device_info)
+        else:
+            connection = ConnectHandler(**device_info)
+        logging.info("Successfully connected to %s", device_info['host'])
+        if "keepalive" not in device_info:
+            # An explicit keepalive (including 0) is applied by Netmiko itself.
+            _enable_keepalive(connection)
+        # Kept on the connection itself so a handler closed directly with
+        # disconnect() is not pinned in memory by the pool.
+        connection._nm_pool_entry = PooledConn(connection, key)
         return connection
-    except NetmikoAuthenticationException as auth_err:
-        logging.error(f"Authentication failed for {device_info['host']}: {auth_err}")
-        return None
-    except NetmikoTimeoutException as timeout_err:
-        logging.error(f"Connection timed out for {device_info['host']}: {timeout_err}")
-        return None
-    except ConnectionException as conn_err:
-        logging.error(f"Connection error for {device_info['host']}: {conn_err}")
-        return None
-    except SSHException as ssh_err:
-        logging.error(f"SSH error while connecting to {device_info['host']}: {ssh_err}")
-        return None
     except Exception as e:
-        logging.error(f"Failed to connect to {device_info['host']}: {e}")
+        message = next((m for t, m in _CONNECT_ERRORS.items() if isinstance(e, t)), "Failed to connect to %s: %s")
+        logging.error(message, device_info['host'], e)
         return None
 
 
-def disconnect_from_device(connection):
+def disconnect_from_device(connection, force=False):
     """
-    Disconnect from a network device.
+    Release a connection to a network device.
+
+    Connections opened by connect_to_device are returned to the pool for reuse
+    unless the pool for that device is full, the connection has exceeded
+    CONNECTION_POOL_MAX_AGE, its channel may still hold unread output, or
+    force is set. A session left in config mode by configure_device_batch is
+    returned to exec mode before it is pooled.
 
     Args:
         connection (netmiko.ConnectHandler): An active connection handler.
+        force (bool): Close the session instead of returning it to the pool.
     """
-    if connection:
-        connection.disconnect()
-        logging.info("Disconnected successfully.")
-    else:
+    if not connection:
         logging.info("No active connection to disconnect.")
+        return
 
+    pooled = _pool_entry(connection)
+    if pooled is not None and not pooled.checked_out:
+        logging.info("Connection already released.")
+        return
+    if (pooled is not None and pooled.in_config_mode and not force
+            and not pooled.dirty and not pooled.pending_output):
+        # The next user of a pooled session expects exec mode.
+        try:
+            connection.exit_config_mode()
+            pooled.in_config_mode = False
+        except Exception as e:
+            logging.warning("Could not leave config mode, closing connection: %s", e)
+            pooled.dirty = True
 
-def execute_command(connection, command):
+    now = time.monotonic()
+    with _POOL_LOCK:
+        if pooled is not None:
+            pooled.checked_out = False
+        if (not force and pooled is not None and not pooled.dirty and not pooled.pending_output
+                and now - pooled.created_at < CONNECTION_POOL_MAX_AGE
+                and len(_POOL.get(pooled.key, [])) < CONNECTION_POOL_MAX_SIZE):
+            pooled.last_used = now
+            _POOL.setdefault(pooled.key, []).append(pooled)
+            logging.info("Connection returned to pool.")
+            return
+
+    connection.disconnect()
+    logging.info("Disconnected successfully.")
+
+
+def execute_command(connection, command, **send_kwargs):
     """
     Execute a command on the connected network device.
 
     Args:
         connection (netmiko.ConnectHandler): An active connection handler.
         command (str): The command to execute.
+        **send_kwargs: Overrides for the arguments passed to send_command.
 
     Returns:
         str: The output of the command execution.
@@ -64,21 +489,23 @@ def execute_command(connection, command):
         return None
 
     try:
-        output = connection.send_command(command)
-        logging.info(f"Command executed successfully: {command}")
+        output = connection.send_command(command, **_send_command_kwargs(connection, send_kwargs))
+        if not _log_if_rejected(command, output):
+            logging.info("Command executed successfully: %s", command)
         return output
     except Exception as e:
-        logging.error(f"Failed to execute command '{command}': {e}")
+        logging.error("Failed to execute command '%s': %s", command, e)
         return None
 
 
-def execute_commands(connection, commands):
+def execute_commands(connection, commands, **send_kwargs):
     """
     Execute multiple commands on the connected network device.
 
     Args:
         connection (netmiko.ConnectHandler): An active connection handler.
         commands (list): A list of commands to execute.
+        **send_kwargs: Overrides for the arguments passed to send_command.
 
     Returns:
         dict: A dictionary with command as key and output as value.
@@ -86,17 +513,166 @@ def execute_commands(connection, commands):
     if not connection:
         logging.info("No active connection to execute commands.")
         return None
+    return dict(iter_execute_commands(connection, commands, **send_kwargs))
+
+
+def iter_execute_commands(connection, commands, **send_kwargs):
+    """
+    Execute multiple commands and yield each result as soon as it arrives.
+
+    Consecutive show/display commands are written to the channel at once and
+    the reply is cut at each prompt, so such a run waits for the prompt once
+    instead of once per command. Any other command may ask for confirmation
+    and is sent on its own with send_command, as is every command when
+    send_kwargs sets anything besides read_timeout. If iteration stops before
+    a pipelined run has been read to the end, the connection is closed rather
+    than returned to the pool by disconnect_from_device.
+
+    Args:
+        connection (netmiko.ConnectHandler): An active connection handler.
+        commands (list): A list of commands to execute.
+        **send_kwargs: Overrides for the arguments passed to send_command.
 
-    results = {}
+    Yields:
+        tuple: (command, output) pairs in order; output is None if the
+        command could not be executed.
+    """
+    if not connection:
+        logging.info("No active connection to execute commands.")
+        return
+
+    kwargs = _send_command_kwargs(connection, send_kwargs)
+    # Pipelining reads raw channel output, so any send_command option other
+    # than read_timeout means every command goes through send_command.
+    can_pipeline = not set(send_kwargs) - {"read_timeout"}
+    for safe, run in itertools.groupby(commands, key=lambda c: bool(_PIPELINE_SAFE_RE.match(c))):
+        run = list(run)
+        if can_pipeline and safe and len(run) > 1:
+            yield from _iter_pipelined(connection, run, kwargs)
+        else:
+            yield from _iter_sequential(connection, run, kwargs)
+
+
+def _log_if_rejected(command, output):
+    """Log a command the device refused; the output itself is still returned."""
+    if output and _CLI_ERROR_RE.search(output):
+        logging.error("Device rejected command '%s': %s", command, output.strip())
+        return True
+    return False
+
+
+def _iter_sequential(connection, commands, kwargs):
     for command in commands:
         try:
-            output = connection.send_command(command)
-            results[command] = output
-            logging.info(f"Command executed successfully: {command}")
+            output = connection.send_command(command, **kwargs)
+            if not _log_if_rejected(command, output):
+                logging.info("Command executed successfully: %s", command)
         except Exception as e:
-            logging.error(f"Failed to execute command '{command}': {e}")
-            results[command] = None
-    return results
+            logging.error("Failed to execute command '%s': %s", command, e)
+            output = None
+        yield command, output
+
+
+def _iter_pipelined(connection, commands, kwargs):
+    try:
+        prompt = _cached_prompt(connection)
+    except Exception as e:
+        logging.warning("Pipelined execution failed, falling back to one command at a time: %s", e)
+        _forget_prompt(connection)
+        connection.clear_buffer()
+        yield from _iter_sequential(connection, commands, kwargs)
+        return
+
+    done = rejected = 0
+    # Until the whole batch is read, the session must not go back to the pool:
+    # the caller may stop iterating (or raise) before the last output arrives.
+    _set_pending_output(connection, True)
+    try:
+        connection.write_channel(connection.RETURN.join(commands) + connection.RETURN)
+        for output in _read_pipelined(connection, prompt, commands, kwargs["read_timeout"]):
+            command = commands[done]
+            done += 1
+            rejected += _log_if_rejected(command, output)
+            if done == len(commands):
+                _set_pending_output(connection, False)
+            yield command, output
+    except Exception as e:
+        # The commands were already written, so they are not resent.
+        logging.error("Pipelined execution failed after %d of %d command(s): %s", done, len(commands), e)
+        _mark_dirty(connection)
+        for command in commands[done:]:
+            yield command, None
+        return
+    logging.info("Executed %d command(s), %d rejected.", len(commands), rejected)
+
+
+def _read_pipelined(connection, prompt, commands, read_timeout=30.0):
+    """
+    Yield the output of each pipelined command as its trailing prompt arrives.
+
+    The device echoes each command and prints its prompt after every output.
+    A command's output ends at a prompt that starts a line and is followed by
+    the echo of the next command (or, for the last command, ends the reply),
+    so prompt text inside a command or its output is not taken as a boundary.
+    read_timeout applies to each command, not to the whole batch.
+    """
+    prompt_re = re.escape(prompt)
+    buffer = pending = ""
+    pos = 0
+    for i, command in enumerate(commands):
+        last = i == len(commands) - 1
+        if last:
+            end_re = re.compile(r"\n" + prompt_re + r"[ \t]*\Z")
+        else:
+            # Prompts such as Junos 'user@r1> ' end in a space before the echo.
+            end_re = re.compile(r"\n" + prompt_re + r"[ \t]*(?=" + re.escape(commands[i + 1]) + r"\n)")
+        deadline = time.monotonic() + read_timeout
+        while True:
+            if i == 0:
+                while buffer.startswith("\n", pos):
+                    pos += 1
+            body_start = _echo_end(buffer, pos, command)
+            match = end_re.search(buffer, body_start - 1) if body_start is not None else None
+            if match and last:
+                # Make sure the reply really stopped at this prompt.
+                time.sleep(0.02)
+                chunk = connection.read_channel()
+                if chunk:
+                    text, pending = _normalize_chunk(connection, pending, chunk)
+                    buffer += text
+                    continue
+            if match:
+                yield buffer[body_start:max(body_start, match.start())]
+                pos = match.end()
+                break
+            if time.monotonic() > deadline:
+                raise ReadTimeout(f"Timed out waiting for the prompt after '{command}'")
+            chunk = connection.read_channel()
+            if chunk:
+                text, pending = _normalize_chunk(connection, pending, chunk)
+                buffer += text
+            else:
+                time.sleep(0.01)
+
+
+def _echo_end(buffer, pos, command):
+    """Index just past the echoed command line at pos, or None if not all read yet."""
+    echo = command + "\n"
+    received = buffer[pos:pos + len(echo)]
+    if received == echo:
+        return pos + len(echo)
+    if echo.startswith(received):
+        return None
+    raise ReadException(f"Unexpected echo for command '{command}': {received!r}")
+
+
+def _normalize_chunk(connection, pending, chunk):
+    """Normalize line endings, holding back a trailing CR until its LF arrives."""
+    text = pending + chunk
+    pending = ""
+    if text.endswith("\r"):
+        text, pending = text[:-1], "\r"
+    return connection.normalize_linefeeds(text), pending
 
 
 def configure_device(connection, configuration_commands):
@@ -116,8 +692,125 @@ def configure_device(connection, configuration_commands):
 
     try:
         output = connection.send_config_set(configuration_commands)
+        _forget_prompt(connection)  # e.g. 'hostname' changes the prompt
         logging.info("Configuration commands executed successfully.")
         return output
     except Exception as e:
-        logging.error(f"Failed to configure device: {e}")
-        return None
\ No newline at end of file
+        _mark_dirty(connection)  # The session may be stuck in config mode
+        logging.error("Failed to configure device: %s", e)
+        return None
+
+
+def configure_device_batch(connection, command_sets, exit_config_mode=True):
+    """
+    Apply several configuration command lists in a single config-mode session.
+
+    Config mode is only entered if the device is not already in it, and is left
+    once at the end of the batch, instead of once per command list. Pass
+    exit_config_mode=False to keep the session in config mode for a following
+    batch on the same connection; disconnect_from_device leaves config mode
+    before the session goes back to the pool.
+
+    Args:
+        connection (netmiko.ConnectHandler): An active connection handler.
+        command_sets (list): A list of configuration command lists.
+        exit_config_mode (bool): Leave config mode after the batch.
+
+    Returns:
+        str: The output of the configuration commands execution.
+    """
+    if not connection:
+        logging.info("No active connection to configure device.")
+        return None
+
+    commands = [command for command_set in command_sets for command in command_set]
+    try:
+        output = connection.send_config_set(
+            commands,
+            enter_config_mode=not connection.check_config_mode(),
+            exit_config_mode=False,
+        )
+        if exit_config_mode:
+            output += connection.exit_config_mode()
+        _set_config_mode(connection, not exit_config_mode)
+        logging.info("Configuration batch of %s command set(s) executed successfully.", len(command_sets))
+        return output
+    except Exception as e:
+        _mark_dirty(connection)  # The session may be stuck in config mode
+        logging.error("Failed to configure device: %s", e)
+        return None
+
+
+def _run_on_device(device_info, commands):
+    """Connect, run commands and release the connection, all in the calling thread."""
+    connection = connect_to_device(device_info)
+    if connection is None:
+        return None
+    try:
+        return execute_commands(connection, commands)
+    finally:
+        disconnect_from_device(connection)
+
+
+def _load_scrapli_backend():
+    # Imported on demand so scrapli stays an optional dependency.
+    import _scrapli_backend
+    return _scrapli_backend
+
+
+async def _run_on_device_async(device_info, commands, executor=None):
+    if NM_BACKEND == "scrapli":
+        return await _load_scrapli_backend().run_on_device(device_info, commands)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _run_on_device, device_info, commands)
+
+
+async def execute_command_async(device_info, command):
+    """
+    Run a single command on a device without blocking the event loop.
+
+    Args:
+        device_info (dict): A dictionary containing device connection details.
+        command (str): The command to execute.
+
+    Returns:
+        str: The output of the command execution.
+    """
+    results = await _run_on_device_async(device_info, [command])
+    return results.get(command) if results else None
+
+
+async def execute_commands_on_devices(devices, commands, max_connections=DEFAULT_MAX_CONNECTIONS):
+    """
+    Run the same commands on many devices concurrently.
+
+    With the default netmiko backend each device is handled in a worker thread
+    (from a pool of max_connections threads) with its own connection; a
+    Netmiko connection is not safe to share between tasks, so max_connections
+    bounds the number of distinct sessions open at once. With
+    NM_BACKEND=scrapli the devices are driven natively on the event loop
+    through asyncssh.
+
+    Args:
+        devices (list): A list of device connection dictionaries.
+        commands (list): A list of commands to execute on every device.
+        max_connections (int): Maximum number of devices contacted at once.
+
+    Returns:
+        list: One entry per device, in input order: the command/output dict,
+        None if the connection failed, or the exception that was raised.
+    """
+    semaphore = asyncio.Semaphore(max_connections)
+    # A dedicated pool, so the default executor's thread cap does not limit
+    # concurrency below max_connections.
+    executor = ThreadPoolExecutor(max_workers=max_connections) if NM_BACKEND == "netmiko" else None
+
+    async def _run(device_info):
+        async with semaphore:
+            return await _run_on_device_async(device_info, commands, executor)
+
+    try:
+        return await asyncio.gather(*(_run(device) for device in devices), return_exceptions=True)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
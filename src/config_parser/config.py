@@ -1,63 +1,216 @@
-import json
-import yaml
-from pathlib import Path
-
-
 """
 Configuration file handler for the network automation project.
 
 This module provides the Config class, which loads and manages configuration
-data from a JSON file located in the 'config' folder inside the
+data from a JSON or YAML file located in the 'config' folder inside the
 'config_parser' package directory. If no path is specified, the default
 location is 'src/config_parser/config/config.json' relative to the project root.
 
 Classes:
-    Config: Handles loading and accessing configuration data from a JSON file.
+    Config: Handles loading and accessing configuration data from a JSON or YAML file.
 
 Usage:
     from config_parser.config import Config
     config = Config()  # Loads from default path
     config = Config(config_path="custom/path/to/config.json")  # Loads from custom path
-    print(config.get_config())  # Access the configuration dictionary
+    print(config.get_config())  # Read-only view of the configuration
+    print(json.dumps(config.to_dict()))  # Plain dict copy for serializing or editing
+    print(config.get("host"))  # Read a single (dotted) key
 """
+import json
+import os
+import pickle
+import yaml
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType, ModuleType
+from typing import Any, ClassVar, Optional
+
+_json_fast: ModuleType
+try:
+    import orjson as _json_fast
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json_fast = json
+
+try:
+    import simdjson  # type: ignore[import-not-found]  # no type stubs
+except ImportError:  # simdjson is optional; Config.get then walks the parsed dict
+    simdjson = None
+
+# libyaml-backed loader when PyYAML was built with it.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Read-only parsed configuration, and the (path, mtime_ns, size) key it is cached under.
+ConfigView = MappingProxyType[str, Any]
+CacheKey = tuple[str, int, int]
+
+
+@lru_cache(maxsize=1)
+def _default_path() -> str:
+    config_dir = Path(__file__).parent / "config"
+    config_dir.mkdir(parents=True, exist_ok=True)  # Ensure the folder exists
+    return str(config_dir / "config.json")
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of parsed config data: mappings become MappingProxyType, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Mutable copy of frozen config data, e.g. for json.dumps."""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+# Parsed configs keyed by (path, mtime_ns, size) so unchanged files are parsed once.
+# Values are frozen with _freeze, so every Config handle can share them safely.
+_CACHE: dict[CacheKey, ConfigView] = {}
+
+# Opt-in on-disk cache of parsed configs, written next to the source file.
+_DISK_CACHE_ENABLED = os.environ.get("CONFIG_DISK_CACHE", "0") == "1"
+
+
 class Config:
-    _instance = None  # Singleton instance
+    __slots__ = ("config_path", "_config", "_parser", "_doc", "_initialized")
+    _instance: ClassVar[Optional["Config"]] = None  # Singleton instance
+
+    config_path: Path
+    _config: Optional[ConfigView]
+    _parser: Any
+    _doc: Any
+    _initialized: bool
 
-    def __new__(cls, config_path: str = None):
+    def __new__(cls, config_path: Optional[str] = None) -> "Config":
         if cls._instance is None:
             cls._instance = super(Config, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: Optional[str] = None):
         if self._initialized:
             return
         if config_path is None:
             config_path = self.get_default_config_path()
         self.config_path = Path(config_path)
-        self.config = self.load_config()
+        self._config = None  # Parsed lazily on first access
+        self._parser = None
+        self._doc = None     # simdjson document backing get() before a full parse
         self._initialized = True
 
-    def get_default_config_path(self) -> str:
-        config_dir = Path(__file__).parent / "config"
-        config_dir.mkdir(parents=True, exist_ok=True)  # Ensure the folder exists
-        return str(config_dir / "config.json")
+    @property
+    def config(self) -> ConfigView:
+        """Read-only configuration, parsed on first access."""
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
+
+    @staticmethod
+    def get_default_config_path() -> str:
+        return _default_path()
+
+    def _cache_key(self) -> CacheKey:
+        stat = self.config_path.stat()
+        return (str(self.config_path), stat.st_mtime_ns, stat.st_size)
 
-    def load_config(self) -> dict:
+    def load_config(self) -> ConfigView:
         if not self.config_path.exists():
-            return {}
+            return MappingProxyType({})
+        key = self._cache_key()
+        if key in _CACHE:
+            return _CACHE[key]
+        parsed = self._load_disk_cache(key) if _DISK_CACHE_ENABLED else None
+        if parsed is None:
+            parsed = self._parse_file()
+            if _DISK_CACHE_ENABLED:
+                self._write_disk_cache(key, parsed)
+        config: ConfigView = _freeze(parsed)
+        for stale in [k for k in _CACHE if k[0] == key[0]]:
+            del _CACHE[stale]  # Older versions of the same file
+        _CACHE[key] = config
+        return config
+
+    def _parse_file(self) -> dict[str, Any]:
         ext = self.config_path.suffix.lower()
-        with open(self.config_path, 'r') as file:
-            if ext in ['.yaml', '.yml']:
-                return yaml.safe_load(file) or {}
-            elif ext == '.json':
-                return json.load(file)
-            else:
-                raise ValueError(f"Unsupported config file extension: {ext}")
-
-    def reload_config(self):
+        parsed: dict[str, Any]
+        if ext in ['.yaml', '.yml']:
+            with open(self.config_path, 'r') as file:
+                parsed = yaml.load(file, Loader=_YamlLoader) or {}
+            return parsed
+        elif ext == '.json':
+            parsed = _json_fast.loads(self.config_path.read_bytes())
+            return parsed
+        else:
+            raise ValueError(f"Unsupported config file extension: {ext}")
+
+    def _disk_cache_path(self) -> Path:
+        return self.config_path.with_suffix(self.config_path.suffix + ".pickle")
+
+    def _load_disk_cache(self, key: CacheKey) -> Optional[dict[str, Any]]:
+        """Return the pickled config if it was written for this mtime and size."""
+        try:
+            stamp, config = pickle.loads(self._disk_cache_path().read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+        return config if stamp == key[1:] else None
+
+    def _write_disk_cache(self, key: CacheKey, config: dict[str, Any]) -> None:
+        cache_path = self._disk_cache_path()
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(pickle.dumps((key[1:], config), protocol=5))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def reload_config(self) -> None:
         """Reload the configuration from file."""
-        self.config = self.load_config()
+        if self.config_path.exists():
+            _CACHE.pop(self._cache_key(), None)
+        self._doc = None
+        self._config = self.load_config()
+
+    def get(self, dotted_key: str, default: Any = None) -> Any:
+        """Return the (read-only) value at a dotted key such as 'devices.0.host', or default."""
+        node = self._lazy_document()
+        if node is None:
+            node = self.config
+        for part in dotted_key.split("."):
+            try:
+                if isinstance(node, (list, tuple)) or (simdjson and isinstance(node, simdjson.Array)):
+                    node = node[int(part)]
+                else:
+                    node = node[part]
+            except (KeyError, IndexError, ValueError, TypeError):
+                return default
+        if simdjson and isinstance(node, simdjson.Object):
+            return _freeze(node.as_dict())
+        if simdjson and isinstance(node, simdjson.Array):
+            return _freeze(node.as_list())
+        return node
 
-    def get_config(self) -> dict:
+    def _lazy_document(self) -> Any:
+        """simdjson view of a JSON config that has not been fully parsed yet."""
+        if (simdjson is None or self._config is not None
+                or self.config_path.suffix.lower() != '.json' or not self.config_path.exists()):
+            return None
+        if self._doc is None:
+            self._parser = simdjson.Parser()
+            self._doc = self._parser.parse(self.config_path.read_bytes())
+        return self._doc
+
+    def get_config(self) -> ConfigView:
+        """Read-only configuration; nested mappings and lists are frozen too."""
         return self.config
+
+    def to_dict(self) -> dict[str, Any]:
+        """Mutable deep copy of the configuration, e.g. for json.dumps."""
+        thawed: dict[str, Any] = _thaw(self.config)
+        return thawed
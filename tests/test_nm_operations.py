@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("netmiko")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts" / "nm_operations"))
+
+import nm_operations  # noqa: E402
+
+
+class FakeChannel:
+    """Replays a device that echoes each command and prints its prompt after the output."""
+
+    RETURN = "\n"
+
+    def __init__(self, prompt, outputs):
+        self.prompt = prompt
+        self.outputs = outputs
+        self.pending = ""
+
+    def find_prompt(self):
+        return self.prompt.strip()
+
+    def write_channel(self, data):
+        for command in data.strip("\n").split("\n"):
+            self.pending += f"{command}\r\n{self.outputs[command]}\r\n{self.prompt}"
+
+    def read_channel(self):
+        chunk, self.pending = self.pending[:7], self.pending[7:]
+        return chunk
+
+    def normalize_linefeeds(self, text):
+        return text.replace("\r\n", "\n")
+
+    def clear_buffer(self):
+        self.pending = ""
+
+
+def test_pipelined_prompt_followed_by_space():
+    # Junos prompts end in a space, so the next echo follows "user@r1> ".
+    outputs = {"show version": "Junos: 21.4R1", "show uptime": "up 3 days"}
+    channel = FakeChannel("user@r1> ", outputs)
+
+    results = nm_operations.execute_commands(channel, list(outputs), read_timeout=1)
+
+    assert results == outputs
+
+
+def test_configure_device_drops_cached_prompt():
+    channel = FakeChannel("R1#", {})
+    channel.send_config_set = lambda commands: "R2(config)#"
+    pooled = nm_operations.PooledConn(channel, ("r1",), prompt="R1#", expect_string=r"R1\#")
+    channel._nm_pool_entry = pooled
+
+    nm_operations.configure_device(channel, ["hostname R2"])
+
+    assert pooled.prompt is None
+    assert pooled.expect_string is None